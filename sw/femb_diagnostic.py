@@ -5,15 +5,27 @@ import sys
 import time
 import pickle
 import argparse
+import zmq
 import numpy as np
 import matplotlib.pyplot as plt
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from matplotlib.figure import Figure
 from matplotlib.colors import LogNorm
 
 from wib import WIB
 import wib_pb2 as wibpb
 
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None # numba is optional, fall back to numpy kernels
+
+try:
+    import pyfftw
+except ImportError:
+    pyfftw = None # pyfftw is optional, fall back to numpy.fft
+
 try:
     from matplotlib.backends.qt_compat import QtCore, QtWidgets, QtGui
 except:
@@ -73,6 +85,8 @@ class DataView(QtWidgets.QWidget):
         self.last_lims = None
         
         self.times,self.data = None,None
+        
+        self.dirty = False # data loaded while not shown, plotted by showEvent
     
     def resize(self, event):
         x,y = self.figure.axes[0].transAxes.transform((0,0.0))
@@ -88,6 +102,16 @@ class DataView(QtWidgets.QWidget):
     def focusOutEvent(self, *args, **kwargs):
         super().focusOutEvent(*args, **kwargs)
         self.toolbar_shown(False)
+        
+    def showEvent(self, *args, **kwargs):
+        super().showEvent(*args, **kwargs)
+        if self.dirty:
+            self.dirty = False
+            self.plot_data()
+            
+    def is_shown(self):
+        '''isVisible remains true while the window is minimized'''
+        return self.isVisible() and not self.window().isMinimized()
     
     def toolbar_shown(self,shown):
         if shown:
@@ -106,6 +130,7 @@ class DataView(QtWidgets.QWidget):
                 setattr(self,prop,val)
             
     def load_data(self,timestamps,samples):
+        '''samples is the [channel][sample] view of a single FEMB shared by all views'''
         pass
         
     def plot_data(self,rescale=False,save_to=None):
@@ -117,27 +142,69 @@ def one_more_bin(array):
 def dupe_last_val(array):
     return np.append(array,array[-1])
 
+if njit is not None:
+    @njit(parallel=True,cache=True,nogil=True)
+    def hist128(samples,out):
+        '''Histogram each [channel][sample] row into out[bin][channel] (1024 bins of 16 ADC counts)'''
+        nbins,nchan = out.shape
+        for c in prange(nchan):
+            row = samples[c]
+            o = np.zeros(nbins,dtype=out.dtype) # contiguous per thread, copied to the column at the end
+            for i in range(row.shape[0]):
+                # clipping to the 14 bit ADC range keeps the bin in bounds without a branch
+                o[min(row[i],16383)>>4] += 1
+            out[:,c] = o
+
+    @njit(parallel=True,cache=True,nogil=True)
+    def mean_rms128(samples,mean,rms):
+        '''Mean and RMS of each [channel][sample] row in a single pass over the samples'''
+        nchan,num = samples.shape
+        for c in prange(nchan):
+            row = samples[c]
+            acc = 0
+            acc2 = 0
+            for i in range(num): # integer sums are exact, so no cancellation in the variance
+                v = np.int64(row[i])
+                acc += v
+                acc2 += v*v
+            m = acc/num
+            mean[c] = m
+            rms[c] = np.sqrt(max(acc2/num - m*m,0.0))
+else:
+    def hist128(samples,out):
+        '''Histogram each [channel][sample] row into out[bin][channel] (1024 bins of 16 ADC counts)'''
+        # Clipped to the 14 bit ADC range every index is in bounds, so the whole
+        # [channel][sample] array is histogrammed with a single bincount.
+        nbins,nchan = out.shape
+        idx = samples.astype(np.int64)
+        np.minimum(idx,16383,out=idx)
+        idx >>= 4
+        idx *= nchan
+        idx += np.arange(nchan,dtype=np.int64)[:,None]
+        out[:] = np.bincount(idx.ravel(),minlength=nbins*nchan).reshape((nbins,nchan))
+
+    def mean_rms128(samples,mean,rms):
+        '''Mean and RMS of each [channel][sample] row from integer sums of samples and squares'''
+        num = samples.shape[1]
+        m = samples.sum(axis=1,dtype=np.int64)/num
+        sq = np.einsum('ij,ij->i',samples,samples,dtype=np.int64)
+        mean[:] = m
+        rms[:] = np.sqrt(np.maximum(sq/num - m*m,0.0))
+
 class MeanRMSView(DataView):
 
     def __init__(self,*args,**kwargs):
         super().__init__(*args,**kwargs)
         self.twin_ax = self.fig_ax.twinx()
         self.chan = np.arange(128)
-        self.rms = np.full_like(self.chan, 0)
-        self.mean = np.full_like(self.chan, 0)
-      
-    def load_data(self,timestamps,samples):
-        samples = samples[self.femb] # [femb][channel][sample] -> [channel][sample]
-        self.rms = np.std(samples,axis=1)
-        self.mean = np.mean(samples,axis=1)
-        
-        
-    def plot_data(self,rescale=False,save_to=None):
-        self.fig_ax.clear()
-        self.twin_ax.clear()
+        # float32 is plenty for the mean/RMS of 14 bit ADC counts; the variance
+        # itself is formed from exact integer sums in float64 by mean_rms128
+        self.rms = np.zeros(len(self.chan),dtype=np.float32)
+        self.mean = np.zeros(len(self.chan),dtype=np.float32)
         
-        self.fig_ax.plot(one_more_bin(self.chan),dupe_last_val(self.mean),drawstyle='steps-post',label='Mean',c='b')
-        self.twin_ax.plot(one_more_bin(self.chan),dupe_last_val(self.rms),drawstyle='steps-post',label='RMS',c='r')
+        # Artists are created once and updated in place by plot_data
+        self.mean_line, = self.fig_ax.plot(one_more_bin(self.chan),dupe_last_val(self.mean),drawstyle='steps-post',label='Mean',c='b')
+        self.rms_line, = self.twin_ax.plot(one_more_bin(self.chan),dupe_last_val(self.rms),drawstyle='steps-post',label='RMS',c='r')
         
         self.fig_ax.set_xlim(0,128)
         self.fig_ax.set_xlabel('Channel Number')
@@ -146,37 +213,56 @@ class MeanRMSView(DataView):
         
         self.fig_ax.legend(loc='upper left')
         self.twin_ax.legend(loc='upper right')
+      
+    def load_data(self,timestamps,samples):
+        mean_rms128(samples,self.mean,self.rms)
+        
+        
+    def plot_data(self,rescale=False,save_to=None):
+        self.mean_line.set_ydata(dupe_last_val(self.mean))
+        self.rms_line.set_ydata(dupe_last_val(self.rms))
+        for ax in (self.fig_ax,self.twin_ax):
+            ax.relim()
+            ax.autoscale_view(scalex=False)
         
         if save_to is not None:
             self.fig_ax.figure.savefig(os.path.join(save_to,'mean_rms.pdf'),bbox_inches='tight')
-        self.fig_ax.figure.canvas.draw()
+        self.fig_ax.figure.canvas.draw_idle()
         self.resize(None)
         
 
 class RMSView(DataView):
 
-    def __init__(self,*args,**kwargs):
+    def __init__(self,*args,mean_view=None,**kwargs):
+        '''mean_view is a MeanView whose single mean_rms128 pass also provides the RMS'''
         super().__init__(*args,**kwargs)
         self.chan = np.arange(128)
-        self.rms = np.full_like(self.chan, 0)
-      
-    def load_data(self,timestamps,samples):
-        samples = samples[self.femb] # [femb][channel][sample] -> [channel][sample]
-        self.rms = np.std(samples,axis=1)
-        
-    def plot_data(self,rescale=False,save_to=None):
-        self.fig_ax.clear()
+        self.mean_view = mean_view
+        if mean_view is None:
+            self.rms = np.zeros(len(self.chan),dtype=np.float32)
+            self.mean = np.zeros(len(self.chan),dtype=np.float32)
+        else:
+            self.rms = mean_view.rms # filled in place by mean_view.load_data
         
-        self.fig_ax.plot(one_more_bin(self.chan),dupe_last_val(self.rms),drawstyle='steps-post',label='RMS',c='r')
+        self.rms_line, = self.fig_ax.plot(one_more_bin(self.chan),dupe_last_val(self.rms),drawstyle='steps-post',label='RMS',c='r')
         
         self.fig_ax.set_xlim(0,128)
         self.fig_ax.set_xlabel('Channel Number')
         self.fig_ax.set_ylabel('RMS ADC Counts')
         self.fig_ax.legend(loc='upper left')
+      
+    def load_data(self,timestamps,samples):
+        if self.mean_view is None:
+            mean_rms128(samples,self.mean,self.rms)
+        
+    def plot_data(self,rescale=False,save_to=None):
+        self.rms_line.set_ydata(dupe_last_val(self.rms))
+        self.fig_ax.relim()
+        self.fig_ax.autoscale_view(scalex=False)
         
         if save_to is not None:
             self.fig_ax.figure.savefig(os.path.join(save_to,'rms.pdf'),bbox_inches='tight')
-        self.fig_ax.figure.canvas.draw()
+        self.fig_ax.figure.canvas.draw_idle()
         self.resize(None)
 
 class MeanView(DataView):
@@ -184,116 +270,237 @@ class MeanView(DataView):
     def __init__(self,*args,**kwargs):
         super().__init__(*args,**kwargs)
         self.chan = np.arange(128)
-        self.mean = np.full_like(self.chan, 0)
-      
-    def load_data(self,timestamps,samples):
-        samples = samples[self.femb] # [femb][channel][sample] -> [channel][sample]
-        self.mean = np.mean(samples,axis=1)
-        
-    def plot_data(self,rescale=False,save_to=None):
-        self.fig_ax.clear()
+        self.rms = np.zeros(len(self.chan),dtype=np.float32) # also plotted by an RMSView sharing this pass
+        self.mean = np.zeros(len(self.chan),dtype=np.float32)
         
-        self.fig_ax.plot(one_more_bin(self.chan),dupe_last_val(self.mean),drawstyle='steps-post',label='Mean',c='b')
+        self.mean_line, = self.fig_ax.plot(one_more_bin(self.chan),dupe_last_val(self.mean),drawstyle='steps-post',label='Mean',c='b')
         
         self.fig_ax.set_xlim(0,128)
         self.fig_ax.set_xlabel('Channel Number')
         self.fig_ax.set_ylabel('Mean ADC Counts')
         self.fig_ax.legend(loc='upper left')
+      
+    def load_data(self,timestamps,samples):
+        mean_rms128(samples,self.mean,self.rms)
+        
+    def plot_data(self,rescale=False,save_to=None):
+        self.mean_line.set_ydata(dupe_last_val(self.mean))
+        self.fig_ax.relim()
+        self.fig_ax.autoscale_view(scalex=False)
         
         if save_to is not None:
             self.fig_ax.figure.savefig(os.path.join(save_to,'mean.pdf'),bbox_inches='tight')
-        self.fig_ax.figure.canvas.draw()
+        self.fig_ax.figure.canvas.draw_idle()
         self.resize(None)
 
 class Hist2DView(DataView):
 
     def __init__(self,*args,**kwargs):
         super().__init__(*args,**kwargs)
-        self.cb = None
         self.chan = np.arange(128)
-        self.samples = np.linspace(0,16385,200)
-        x,_ = np.meshgrid(self.chan,self.samples)
-        self.counts = np.full_like(x,0)
+        self.samples = np.arange(0,16385,16) # bin edges, 1024 bins of 16 ADC counts
+        # [bin][channel] as displayed. A spy buffer holds ~2184 frames, so uint16
+        # counts cannot overflow and halve the data handed to imshow.
+        self.counts = np.zeros((len(self.samples)-1,len(self.chan)),dtype=np.uint16)
+        
+        # Image and colorbar are created once and updated in place by plot_data
+        ax = self.fig_ax
+        self.im = ax.imshow(self.counts,extent=(self.chan[0],self.chan[-1],self.samples[0],self.samples[-1]),
+                          aspect='auto',interpolation='none',origin='lower',cmap=plt.get_cmap('GnBu'))
+        self.cb = ax.figure.colorbar(self.im)
+        
+        ax.set_title('Sample Histogram')
+        ax.set_xlabel('Channel Number')
+        ax.set_ylabel('ADC Counts (16 count bins)')
       
     def load_data(self,timestamps,samples):
         #timestamps = self.data_source.timestamps[0]
-        samples = samples[self.femb] # [femb][channel][sample] -> [channel][sample]
-        self.counts = []
-        for i in self.chan:
-            counts,bins = np.histogram(samples[i],bins=self.samples)
-            self.counts.append(counts)
-        self.counts = np.asarray(self.counts)
+        if samples.shape[1] > np.iinfo(self.counts.dtype).max: # a single bin could overflow
+            self.counts = self.counts.astype(np.int32)
+        hist128(samples,self.counts)
         
     def plot_data(self,rescale=False,save_to=None):
         ax = self.fig_ax
-        ax.clear()
-        if self.cb is not None:
-            self.cb.remove()
         
         try:
-            im = ax.imshow(self.counts.T,extent=(self.chan[0],self.chan[-1],self.samples[0],self.samples[-1]),
-                          aspect='auto',interpolation='none',origin='lower',cmap=plt.get_cmap('GnBu'))
-            self.cb = ax.figure.colorbar(im)
+            self.im.set_data(self.counts)
+            self.im.set_clim(self.counts.min(),self.counts.max()) # updates the existing norm and colorbar
         except:
             print('Error plotting ADC count histogram')
         
-        ax.set_title('Sample Histogram')
-        ax.set_xlabel('Channel Number')
-        ax.set_ylabel('ADC Counts')
-        
         if save_to is not None:
             ax.figure.savefig(os.path.join(save_to,'hist.pdf'),bbox_inches='tight')
-        ax.figure.canvas.draw()
+        ax.figure.canvas.draw_idle()
         #self.resize(None)
 
 class FFTView(DataView):
 
     def __init__(self,*args,**kwargs):
         super().__init__(*args,**kwargs)
-        self.cb = None
         self.chan = np.arange(128)
-        freq = np.fft.fftfreq(2184,320e-9) 
-        freq_idx = np.argsort(freq)[len(freq)//2::]
-        self.freq = freq[freq_idx]
-        x,_ = np.meshgrid(self.chan,self.freq)
-        self.fft = np.full_like(x,1)
+        self.allocate(2184)
+        
+        # Image and colorbar are created once and updated in place by plot_data
+        ax = self.fig_ax
+        self.im = ax.imshow(self.fft.T[1:,:],extent=(self.chan[0],self.chan[-1],self.freq[0]/1000,self.freq[-1]/1000),
+                          aspect='auto',interpolation='none',origin='lower',norm=LogNorm(vmin=1,vmax=1),cmap=plt.get_cmap('Spectral_r'))
+        self.cb = ax.figure.colorbar(self.im)
+        
+        ax.set_title('Power Spectrum')
+        ax.set_xlabel('Channel Number')
+        ax.set_ylabel('Frequency (kHz)')
+        
+    def allocate(self,num):
+        '''Sets up the frequencies, buffers, and FFTW plan for num samples per channel'''
+        self.num = num
+        self.freq = np.fft.rfftfreq(num,320e-9)
+        # [channel][frequency], unlike the [frequency][channel] image: the batched
+        # transforms run along axis 1, and writing |X| transposed costs far more
+        # than the strided view handed to imshow (which copies its data anyway)
+        self.fft = np.ones((len(self.chan),len(self.freq)),dtype=np.float32)
+        if pyfftw is not None:
+            self.fft_in = pyfftw.empty_aligned((len(self.chan),num),dtype='float32')
+            self.fft_out = pyfftw.empty_aligned((len(self.chan),len(self.freq)),dtype='complex64')
+            self.fft_plan = pyfftw.FFTW(self.fft_in,self.fft_out,axes=(1,),threads=os.cpu_count(),flags=('FFTW_MEASURE',))
         
     def load_data(self,timestamps,samples):
         #timestamps = self.data_source.timestamps[0]
-        samples = samples[self.femb] # [femb][channel][sample] -> [channel][sample]
-        freq = np.fft.fftfreq(len(samples[0]),320e-9) 
-        freq_idx = np.argsort(freq)[len(freq)//2::]
-        self.freq = freq[freq_idx]
-        self.fft = []
-        for i in self.chan:
-            fft = np.fft.fft(samples[i])
-            self.fft.append(np.square(np.abs(fft[freq_idx])))
-        self.fft = np.asarray(self.fft)
-        self.fft[self.fft < 1e-4] = 1e-4 # To prevent log scaling from throwing errors
+        if samples.shape[1] != self.num: # buffers are reused while the sample count is unchanged
+            self.allocate(samples.shape[1])
+        # all channels at once, non-negative frequencies only
+        if pyfftw is not None:
+            self.fft_in[:] = samples
+            fft = self.fft_plan()
+        else:
+            fft = np.fft.rfft(samples,axis=1)
+        np.abs(fft,out=self.fft) # |X|^2 computed in place, without temporaries
+        np.square(self.fft,out=self.fft)
+        np.maximum(self.fft,1e-4,out=self.fft) # To prevent log scaling from throwing errors
     
     def plot_data(self,rescale=False,save_to=None):
         ax = self.fig_ax
-        ax.clear()
-        if self.cb is not None:
-            self.cb.remove()
         
         try:
-            im = ax.imshow(self.fft.T[1:,:],extent=(self.chan[0],self.chan[-1],self.freq[0]/1000,self.freq[-1]/1000),
-                          aspect='auto',interpolation='none',origin='lower',norm=LogNorm(),cmap=plt.get_cmap('Spectral_r'))
-            self.cb = ax.figure.colorbar(im)
+            spectrum = self.fft.T[1:,:] # DC is not shown
+            self.im.set_data(spectrum)
+            self.im.set_extent((self.chan[0],self.chan[-1],self.freq[0]/1000,self.freq[-1]/1000))
+            # Limits straight from the (already positive) data, LogNorm.autoscale would mask a copy every frame
+            self.im.set_clim(spectrum.min(),spectrum.max())
         except:
             print('Error plotting FFT power spectrum')
         
-        ax.set_title('Power Spectrum')
-        ax.set_xlabel('Channel Number')
-        ax.set_ylabel('Frequency (kHz)')
-        
         if save_to is not None:
             ax.figure.savefig(os.path.join(save_to,'fft.pdf'),bbox_inches='tight')
-        ax.figure.canvas.draw()
+        ax.figure.canvas.draw_idle()
         self.resize(None)
         
+class AcquisitionWorker(QtCore.QObject):
+    '''Reads the WIB spy buffer in a loop while running, emitting data_ready for each readout'''
+    data_ready = QtCore.pyqtSignal(object,object)
+    
+    def __init__(self,wib_server='127.0.0.1',buf0=True,buf1=True,depth=2,timeout=5):
+        super().__init__()
+        self.wib_server = wib_server
+        self.depth = depth # readout requests kept queued on the wib_server
+        self.timeout = timeout # seconds without a reply before the requests are given up on
+        # identical for every readout, so serialized once
+        self.request = WIB.pack_command(WIB.daq_spy_command(buf0=buf0,buf1=buf1))
+        self.reply = wibpb.ReadDaqSpy.DeframedDaqSpy() # reused, ParseFromString clears it
+        self.context = None
+        self.socket = None
+        self.pending = 0
+        self.running = False
+        self.ready = QtCore.QSemaphore(1) # released by the GUI once it is done with a readout
+        
+    def connect(self):
+        # A DEALER socket (unlike REQ) may have several requests outstanding to
+        # the wib_server REP socket, so the next readout is already queued when
+        # a reply arrives. zmq sockets must stay on the thread that uses them.
+        if self.context is None:
+            self.context = zmq.Context()
+        self.socket = self.context.socket(zmq.DEALER)
+        self.socket.setsockopt(zmq.LINGER,0) # unsent requests are dropped on close
+        self.socket.setsockopt(zmq.RCVHWM,4)
+        self.socket.connect('tcp://%s:1234'%self.wib_server)
+        self.poller = zmq.Poller()
+        self.poller.register(self.socket,zmq.POLLIN)
+        self.pending = 0
+        
+    def disconnect(self):
+        '''Closes the socket, giving up on any outstanding requests'''
+        if self.socket is not None:
+            self.socket.close()
+            self.socket = None
+        self.pending = 0
+        
+    def close(self):
+        '''Releases the socket and context, once run() has returned'''
+        self.disconnect()
+        if self.context is not None:
+            self.context.term()
+            self.context = None
+        
+    def send_request(self):
+        self.socket.send_multipart([b'',self.request]) # empty delimiter as sent by REQ
+        self.pending += 1
+        
+    def recv_replies(self):
+        '''Returns all replies that have arrived without blocking'''
+        replies = []
+        while self.pending > 0:
+            try:
+                _,reply = self.socket.recv_multipart(zmq.NOBLOCK)
+            except zmq.Again:
+                break
+            self.pending -= 1
+            replies.append(reply)
+        return replies
+        
+    @QtCore.pyqtSlot()
+    def run(self):
+        if self.socket is None:
+            self.connect()
+        stale = self.pending # replies to requests made before the last stop
+        deadline = time.monotonic() + self.timeout
+        while self.running:
+            while self.pending < self.depth:
+                self.send_request()
+            if not self.poller.poll(100):
+                if time.monotonic() > deadline:
+                    # The wib_server lost the requests (e.g. it was restarted), so
+                    # their replies never arrive. Start over on a fresh socket.
+                    print('No reply from WIB, reconnecting')
+                    self.disconnect()
+                    self.connect()
+                    stale = 0
+                    deadline = time.monotonic() + self.timeout
+                continue
+            deadline = time.monotonic() + self.timeout
+            replies = self.recv_replies()
+            drop = min(stale,len(replies))
+            stale -= drop
+            replies = replies[drop:]
+            if len(replies) == 0:
+                continue
+            # Only the newest of a batch of replies is worth plotting
+            rep = self.reply
+            rep.ParseFromString(replies[-1])
+            if not rep.success:
+                print('Failed to read WIB spy buffer')
+                time.sleep(0.5)
+                continue
+            timestamps,samples = WIB.decode_daq_spy(rep)
+            # Wait for the GUI to finish with the previous readout. This one was
+            # acquired while that was being plotted.
+            while not self.ready.tryAcquire(1,100):
+                if not self.running:
+                    return
+            self.data_ready.emit(timestamps,samples)
+            deadline = time.monotonic() + self.timeout # time spent waiting on the GUI does not count
+        
 class FEMBDiagnostics(QtWidgets.QMainWindow):
+    start_continuous = QtCore.pyqtSignal()
+    
     def __init__(self,wib_server='127.0.0.1',femb=0,cold=False,grid=False,save_to=None,config=None,test=False):
         super().__init__()
         
@@ -311,7 +518,8 @@ class FEMBDiagnostics(QtWidgets.QMainWindow):
         
         self.grid = QtWidgets.QGridLayout()
         if grid:
-            self.views = [Hist2DView(femb=femb), FFTView(femb=femb), MeanView(femb=femb), RMSView(femb=femb)]
+            mean_view = MeanView(femb=femb)
+            self.views = [Hist2DView(femb=femb), FFTView(femb=femb), mean_view, RMSView(femb=femb,mean_view=mean_view)]
             for i,v in enumerate(self.views):
                 self.grid.addWidget(v,i%2,i//2)
         else:
@@ -320,6 +528,16 @@ class FEMBDiagnostics(QtWidgets.QMainWindow):
                 self.grid.addWidget(v,0,i)
         layout.addLayout(self.grid)
         
+        # Views only read the samples and fill their own arrays, so they can be
+        # loaded concurrently. numba's parallel kernels already use every core and
+        # must not be launched from several threads at once, so views using them
+        # are loaded on the calling thread while the rest go to the pool.
+        if njit is None:
+            self.pooled_views = self.views
+        else:
+            self.pooled_views = [v for v in self.views if isinstance(v,FFTView)]
+        self.pool = ThreadPoolExecutor(max_workers=len(self.pooled_views))
+        
         nav_layout = QtWidgets.QHBoxLayout()
         
         button = QtWidgets.QPushButton('Configure')
@@ -338,8 +556,14 @@ class FEMBDiagnostics(QtWidgets.QMainWindow):
         button.clicked.connect(self.toggle_continuous)
         self.continuious_button = button
         
-        self.timer = QtCore.QTimer(self)
-        self.timer.timeout.connect(self.acquire_data)
+        # Continuous acquisition runs on its own thread so the GUI is not blocked
+        # waiting for the WIB, and the next readout overlaps with plotting
+        self.worker = AcquisitionWorker(wib_server,buf0=femb<2,buf1=femb>=2)
+        self.worker_thread = QtCore.QThread(self)
+        self.worker.moveToThread(self.worker_thread)
+        self.worker.data_ready.connect(self.continuous_data)
+        self.start_continuous.connect(self.worker.run)
+        self.worker_thread.start()
         
         layout.addLayout(nav_layout)
         
@@ -350,27 +574,54 @@ class FEMBDiagnostics(QtWidgets.QMainWindow):
         if self.continuious_button.text() == 'Continuous':
             self.continuious_button.setText('Stop')
             print('Starting continuous acquisition')
-            self.timer.start(500)
+            self.worker.running = True
+            self.start_continuous.emit()
         else:
             self.continuious_button.setText('Continuous')
-            self.timer.stop()
+            self.worker.running = False
     
     @QtCore.pyqtSlot()
     def acquire_data(self):
         data = self.wib.acquire_data(buf0=self.femb<2,buf1=self.femb>=2)
         if data is None:
             return
-            
-        self.timestamps,self.samples = data
-        for view in self.views:
-            view.load_data(self.timestamps,self.samples)
+        self.load_data(*data)
+        
+    @QtCore.pyqtSlot(object,object)
+    def continuous_data(self,timestamps,samples):
+        try:
+            self.load_data(timestamps,samples)
+        finally:
+            self.worker.ready.release() # worker may hand over the next acquisition
+        
+    def load_data(self,timestamps,samples):
+        self.timestamps,self.samples = timestamps,samples
+        samples = self.samples[self.femb] # [femb][channel][sample] -> [channel][sample]
+        pending = [self.pool.submit(view.load_data,self.timestamps,samples) for view in self.pooled_views]
+        try:
+            for view in self.views:
+                if view not in self.pooled_views:
+                    view.load_data(self.timestamps,samples)
+        finally:
+            for future in pending:
+                future.result()
             
         self.plot(self.save_to)
         
     def plot(self,save_to):
         for view in self.views:
+            if save_to is None and not view.is_shown():
+                view.dirty = True # skip drawing until the view is shown again
+                continue
             view.plot_data(save_to=save_to)
             
+    def closeEvent(self,event):
+        self.worker.running = False
+        self.worker_thread.quit()
+        self.worker_thread.wait()
+        self.worker.close() # the worker thread has finished with the socket
+        super().closeEvent(event)
+            
     @QtCore.pyqtSlot()
     def configure_wib(self):
         if self.config is not None:
@@ -10,11 +10,20 @@ class WIB:
         self.context = zmq.Context()
         self.socket = self.context.socket(zmq.REQ)
         self.socket.connect('tcp://%s:1234'%wib_server)
+        # Reused by every acquire_data call; parsing a reply replaces its bytes
+        # fields, so arrays returned by earlier calls stay valid
+        self.daq_spy_req = wibpb.ReadDaqSpy()
+        self.daq_spy_rep = wibpb.ReadDaqSpy.DeframedDaqSpy()
 
-    def send_command(self,req,rep):
+    @staticmethod
+    def pack_command(req):
+        '''Serializes req wrapped in a Command, as wib_server expects it'''
         cmd = wibpb.Command()
         cmd.cmd.Pack(req)
-        self.socket.send(cmd.SerializeToString())
+        return cmd.SerializeToString()
+
+    def send_command(self,req,rep):
+        self.socket.send(self.pack_command(req))
         rep.ParseFromString(self.socket.recv())
         
     def defaults(self):
@@ -92,9 +101,11 @@ class WIB:
         print('Successful: ',rep.success)
         return rep.success
         
-    def acquire_data(self,buf0=True,buf1=True,deframe=True,channels=True,ignore_failure=False,trigger_command=0,trigger_rec_ticks=0,trigger_timeout_ms=0):
-        print('Reading out WIB spy buffer')
-        req = wibpb.ReadDaqSpy()
+    @staticmethod
+    def daq_spy_command(buf0=True,buf1=True,deframe=True,channels=True,trigger_command=0,trigger_rec_ticks=0,trigger_timeout_ms=0,req=None):
+        '''Fills in (or creates, if req is None) and returns a ReadDaqSpy request'''
+        if req is None:
+            req = wibpb.ReadDaqSpy()
         req.buf0 = buf0
         req.buf1 = buf1
         req.deframe = deframe
@@ -102,16 +113,26 @@ class WIB:
         req.trigger_command = trigger_command
         req.trigger_rec_ticks = trigger_rec_ticks
         req.trigger_timeout_ms = trigger_timeout_ms
-        rep = wibpb.ReadDaqSpy.DeframedDaqSpy()
-        self.send_command(req,rep)
-        print('Successful:',rep.success)
-        if not ignore_failure and not rep.success:
-            return None
+        return req
+        
+    @staticmethod
+    def decode_daq_spy(rep):
+        '''Returns the [link][sample] timestamps and [femb][channel][sample] samples of a DeframedDaqSpy reply'''
         num = rep.num_samples
-        print('Acquired %i samples'%num)
         timestamps = np.frombuffer(rep.deframed_timestamps,dtype=np.uint64).reshape((2,num))
         samples = np.frombuffer(rep.deframed_samples,dtype=np.uint16).reshape((4,128,num))
         return timestamps,samples
+        
+    def acquire_data(self,buf0=True,buf1=True,deframe=True,channels=True,ignore_failure=False,trigger_command=0,trigger_rec_ticks=0,trigger_timeout_ms=0):
+        print('Reading out WIB spy buffer')
+        req = self.daq_spy_command(buf0,buf1,deframe,channels,trigger_command,trigger_rec_ticks,trigger_timeout_ms,req=self.daq_spy_req)
+        rep = self.daq_spy_rep
+        self.send_command(req,rep)
+        print('Successful:',rep.success)
+        if not ignore_failure and not rep.success:
+            return None
+        print('Acquired %i samples'%rep.num_samples)
+        return self.decode_daq_spy(rep)
     
     def print_timing_status(self,timing_status):
         print('--- PLL INFO ---')